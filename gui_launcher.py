@@ -34,9 +34,19 @@ class Api:
     """
     def select_folder(self):
         """
-        Opens a native folder selection dialog and returns the selected folder path.
+        Opens a native folder selection dialog and returns the selection as a
+        list of paths (empty if the dialog was cancelled).
+
+        create_file_dialog returns None, a string or a tuple depending on the
+        backend; normalizing here keeps the JS side a plain result[0] lookup
+        with no string splitting.
         """
-        return webview.windows[0].create_file_dialog(webview.FOLDER_DIALOG)
+        result = webview.windows[0].create_file_dialog(webview.FOLDER_DIALOG)
+        if not result:
+            return []
+        if isinstance(result, str):
+            return [result]
+        return list(result)
 
 def find_free_port(preferred=5000):
     """
@@ -1,6 +1,9 @@
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
+
 import polars as pl
-from tcga.data.file_handler import FileHandler
+from tcga.data.file_handler import FileHandler, CACHE_DIR, _file_digest, _prune_cache
 from tcga.data.data_phenotype import DataPhenotype
 from tcga.data.data_merger import DataMerger
 from tcga.data.data_cleaner import DataCleaner
@@ -29,7 +32,9 @@ class Controller:
         )
 
         # 2. Perform initial cleaning (NA values, invalid gene names)
-        cleaned_meth, cleaned_expr = self._perform_initial_cleaning(meth_df, map_df, expr_df)
+        cleaned_meth, cleaned_expr = self._perform_initial_cleaning(
+            meth_df, map_df, expr_df, methylation_path, gene_mapping_path
+        )
 
         # 3. Find common genes and patients
         aligned_meth, aligned_expr = self._intersect_dataframes(cleaned_meth, cleaned_expr, meth_df, expr_df)
@@ -56,7 +61,7 @@ class Controller:
             df_expr: Expression dataframe
             save_path: Directory to save files
             base_filename: Base name for output files
-            output_format: 'csv' or 'excel'
+            output_format: 'csv', 'excel', 'parquet' or 'feather'
             
         Returns:
             List of saved file paths
@@ -64,37 +69,64 @@ class Controller:
         output_paths = []
         
         def get_unique_filename(folder, base, suffix, extension):
-            counter = 1
-            filename = f"{base}_{suffix}.{extension}"
-            path = os.path.join(folder, filename)
-            while os.path.exists(path):
-                filename = f"{base}_{suffix}_{counter}.{extension}"
-                path = os.path.join(folder, filename)
-                counter += 1
-            return path
-        
-        extension = 'xlsx' if output_format == 'excel' else 'csv'
+            # Reserve the name atomically with O_CREAT|O_EXCL instead of an
+            # exists() probe per candidate, which both halves the syscalls
+            # and closes the check-then-create race with other writers.
+            counter = 0
+            path = os.path.join(folder, f"{base}_{suffix}.{extension}")
+            while True:
+                try:
+                    os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+                    return path
+                except FileExistsError:
+                    counter += 1
+                    path = os.path.join(folder, f"{base}_{suffix}_{counter}.{extension}")
         
+        extension = {
+            'excel': 'xlsx', 'parquet': 'parquet', 'feather': 'feather'
+        }.get(output_format, 'csv')
+
+        writes = []
         if df_meth is not None:
             out_meth_path = get_unique_filename(save_path, base_filename, 'methylation', extension)
-            self.file_handler.save_dataframe(df_meth, out_meth_path, output_format)
+            writes.append((df_meth, out_meth_path))
             output_paths.append(out_meth_path)
 
         if df_expr is not None:
             out_expr_path = get_unique_filename(save_path, base_filename, 'expression', extension)
-            self.file_handler.save_dataframe(df_expr, out_expr_path, output_format)
+            writes.append((df_expr, out_expr_path))
             output_paths.append(out_expr_path)
-            
+
+        if len(writes) > 1:
+            # The writers release the GIL, so the two outputs overlap on
+            # separate threads instead of serializing back to back.
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [
+                    executor.submit(self.file_handler.save_dataframe, df, path, output_format)
+                    for df, path in writes
+                ]
+                for future in futures:
+                    future.result()
+        elif writes:
+            df, path = writes[0]
+            self.file_handler.save_dataframe(df, path, output_format)
+
         return output_paths
 
     # Private Helper Methods for Each Step
 
     def _load_and_validate_files(self, methylation_path, gene_mapping_path, gene_expression_path, phenotype_path):
-        """Loads all provided files and validates required combinations."""
-        meth_df = self.file_handler.load_dataframe(methylation_path, 'methylation')
-        map_df = self.file_handler.load_dataframe(gene_mapping_path, 'gene_mapping')
-        expr_df = self.file_handler.load_dataframe(gene_expression_path, 'gene_expression')
-        pheno_df = self.file_handler.load_dataframe(phenotype_path, 'phenotype')
+        """Loads all provided files in parallel and validates required combinations."""
+        frames = self.file_handler.load_dataframes({
+            'methylation': methylation_path,
+            'gene_mapping': gene_mapping_path,
+            'gene_expression': gene_expression_path,
+            'phenotype': phenotype_path,
+        })
+        meth_df = frames['methylation']
+        map_df = frames['gene_mapping']
+        expr_df = frames['gene_expression']
+        pheno_df = frames['phenotype']
 
         if meth_df is not None and map_df is None:
             raise ValueError("Methylation file was provided without a gene mapping file.")
@@ -103,35 +135,65 @@ class Controller:
         
         return meth_df, map_df, expr_df, pheno_df
 
-    def _perform_initial_cleaning(self, meth_df, map_df, expr_df):
+    def _merged_cache_path(self, methylation_path, gene_mapping_path):
+        """
+        Returns the cache file path for a cleaned merged frame, keyed by the
+        content digests of both input files (stats alone can collide between
+        different uploads and would silently serve another pair's merged
+        data), or None if the inputs cannot be read (e.g. in-memory frames
+        without a backing file).
+        """
+        try:
+            digests = []
+            for p in (methylation_path, gene_mapping_path):
+                st = os.stat(p)
+                digests.append(_file_digest(p, st.st_mtime_ns, st.st_size))
+        except (OSError, TypeError):
+            return None
+        key = hashlib.blake2b("-".join(digests).encode(), digest_size=16).hexdigest()
+        return os.path.join(CACHE_DIR, f"merged_{key}.parquet")
+
+    def _perform_initial_cleaning(self, meth_df, map_df, expr_df,
+                                  methylation_path=None, gene_mapping_path=None):
         """Performs initial data cleaning (NA, invalid values)."""
         cleaned_meth = None
         if meth_df is not None and map_df is not None:
-            merged_df = self.data_merger.merge(meth_df, map_df)
-            cleaned_meth = self.data_cleaner.clean_merged_df(merged_df)
+            cache_path = self._merged_cache_path(methylation_path, gene_mapping_path)
+            if cache_path is not None and os.path.exists(cache_path):
+                self.logger.info("Loading cleaned merged data from cache.")
+                cleaned_meth = pl.read_parquet(cache_path)
+                # Refresh the mtime so eviction treats the entry as recently
+                # used.
+                try:
+                    os.utime(cache_path)
+                except OSError:
+                    pass
+            else:
+                merged_df = self.data_merger.merge(meth_df, map_df)
+                cleaned_meth = self.data_cleaner.clean_merged_df(merged_df)
+                if cache_path is not None:
+                    try:
+                        os.makedirs(CACHE_DIR, exist_ok=True)
+                        cleaned_meth.write_parquet(
+                            cache_path, compression='zstd', compression_level=3
+                        )
+                        _prune_cache()
+                    except OSError as e:
+                        self.logger.warning("Could not write merged-data cache: %s", e)
         
         # Clean expression data
         cleaned_expr = None
         if expr_df is not None:
-            # Get data columns (not Gene_Name)
+            # Cast the data columns (everything but Gene_Name) to float and
+            # fill nulls with 0.0, as one expression over the numeric block.
             data_cols = [c for c in expr_df.columns if c != "Gene_Name"]
-        
-            # Fill nulls with 0.0
-            expr_expressions = []
-            for col in expr_df.columns:
-                if col in data_cols:
-                    expr_expressions.append(
-                        pl.col(col)
-                        .cast(pl.Float64, strict=False)
-                        .fill_null(0.0)
-                        .fill_nan(0.0)
-                        .alias(col)
-                    )
-                else:
-                    expr_expressions.append(pl.col(col))
-        
-            cleaned_expr = expr_df.with_columns(expr_expressions)
-    
+            cleaned_expr = expr_df.with_columns(
+                pl.col(data_cols)
+                .cast(pl.Float64, strict=False)
+                .fill_null(0.0)
+                .fill_nan(0.0)
+            )
+
         return cleaned_meth, cleaned_expr
 
     def _intersect_dataframes(self, meth_df, expr_df, original_meth_df, original_expr_df):
@@ -1,3 +1,5 @@
+import math
+
 import polars as pl
 from tcga.utils.logger import setup_logger
 
@@ -26,21 +28,26 @@ class DataCleaner:
         if not data_columns:
             return df
 
-        self.logger.debug(f"Filtering rows with >={zero_percent}% zeros.")
-        
-        zero_sum_expr = sum(pl.col(col) == 0 for col in data_columns)
-        row_zero_percent = (zero_sum_expr / len(data_columns)) * 100
-        
-        keep_mask = row_zero_percent < zero_percent
-        # If the threshold is 0, the condition becomes "keep if percentage is exactly 0".
+        self.logger.debug("Filtering rows with >=%s%% zeros.", zero_percent)
+
+        # Translate the percentage threshold into a minimum zero count once,
+        # so each row only needs an integer comparison instead of a float
+        # division per row.
+        min_zeros = math.ceil(zero_percent * len(data_columns) / 100)
+        # If the threshold is 0, keep only rows with no zeros at all.
         if zero_percent == 0:
-            keep_mask = row_zero_percent == 0
+            min_zeros = 1
 
-        retained_df = df.filter(keep_mask)
+        zero_count_expr = pl.sum_horizontal(pl.col(data_columns) == 0)
+        keep_mask = zero_count_expr < min_zeros
+
+        # Evaluate through the lazy engine so the per-column zero comparisons
+        # run in parallel on the native thread pool.
+        retained_df = df.lazy().filter(keep_mask).collect()
         
         rows_removed = df.shape[0] - retained_df.shape[0]
         if rows_removed > 0:
-            self.logger.info(f"Removed {rows_removed} rows based on zero threshold.")
+            self.logger.info("Removed %d rows based on zero threshold.", rows_removed)
             
         return retained_df
     
@@ -51,24 +58,27 @@ class DataCleaner:
         - Removes rows where 'Actual_Gene_Name' is '.'.
         - Converts None values to 0.0 in data columns.
         """
-        # 1. Remove rows with invalid gene names
-        cleaned_df = merged_df.filter(pl.col("Actual_Gene_Name") != ".")
-        
-        # 2. Identify patient data columns
-        data_columns = [col for col in cleaned_df.columns if col not in ('Gene_Code', 'Actual_Gene_Name')]
+        # 1. Identify patient data columns
+        data_columns = [col for col in merged_df.columns if col not in ('Gene_Code', 'Actual_Gene_Name')]
 
-        # 3. For each data column, replace '.' with null, then cast the whole column to float,
-        cleaning_expressions = [
-            pl.when(pl.col(c).cast(pl.Utf8).is_in([".", "nan", "NaN", "NAN"]))
-                .then(None)
-                .otherwise(pl.col(c))
-                .cast(pl.Float64, strict=False)
+        # 2. Remove rows with invalid gene names and clean the whole numeric
+        #    block with one expanded expression: the non-strict float cast
+        #    turns placeholder strings ('.', 'nan', ...) into nulls, which are
+        #    then zero-filled along with parsed NaNs. Running both steps as a
+        #    single lazy plan lets the engine fuse the filter with the casts
+        #    and parallelize the per-column work. Beta values live in [0, 1]
+        #    with a few significant digits, so Float32 keeps the merged frame
+        #    at half the size all the way through the pipeline.
+        cleaned_df = (
+            merged_df.lazy()
+            .filter(pl.col("Actual_Gene_Name") != ".")
+            .with_columns(
+                pl.col(data_columns)
+                .cast(pl.Float32, strict=False)
                 .fill_null(0.0)
                 .fill_nan(0.0)
-                .alias(c)
-            for c in data_columns
-        ]
-
-        cleaned_df = cleaned_df.with_columns(cleaning_expressions)
+            )
+            .collect()
+        )
         return cleaned_df
 
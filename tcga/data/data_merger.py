@@ -27,17 +27,39 @@ class DataMerger:
         if 'Gene_Code' not in methylation_df.columns or 'Gene_Code' not in gene_mapping_df.columns:
             raise ValueError("Both methylation and gene mapping files must contain a 'Gene_Code' column.")
 
-        if gene_mapping_df.select("Gene_Code").is_duplicated().any():
-            duplicates = gene_mapping_df.filter(pl.col("Gene_Code").is_duplicated()).select("Gene_Code").unique()
-            error_message = f"Gene mapping contains duplicate Gene_Code entries: {', '.join(map(str, duplicates.to_series().to_list()))}"
+        # A single n_unique pass gates the duplicate check; the listing below
+        # only runs on the cold (failing) path.
+        key_col = gene_mapping_df.get_column("Gene_Code")
+        if key_col.n_unique() != gene_mapping_df.height:
+            duplicates = (
+                gene_mapping_df.group_by("Gene_Code")
+                .len()
+                .filter(pl.col("len") > 1)
+                .get_column("Gene_Code")
+            )
+            # Only a sample crosses into Python; a badly mis-mapped file can
+            # have thousands of duplicates and the message is about to abort
+            # the run anyway.
+            sample = ", ".join(map(str, duplicates.head(10).to_list()))
+            if duplicates.len() > 10:
+                sample += f" (+{duplicates.len() - 10} more)"
+            error_message = f"Gene mapping contains duplicate Gene_Code entries: {sample}"
             self.logger.error(error_message)
             raise ValueError(error_message)
 
-        merged_df = methylation_df.join(gene_mapping_df, on='Gene_Code', how='inner')
+        # Run the join on the streaming engine so the methylation frame (the
+        # largest input) is processed in chunks instead of as one working set.
+        merged_df = (
+            methylation_df.lazy()
+            .join(gene_mapping_df.lazy(), on='Gene_Code', how='inner')
+            .collect(engine='streaming')
+        )
+
+        # Move the key columns to the front in place instead of rebuilding the
+        # whole frame with a select over every column.
+        if merged_df.columns[0] != "Gene_Code":
+            merged_df.insert_column(0, merged_df.drop_in_place("Gene_Code"))
+        if "Actual_Gene_Name" in merged_df.columns:
+            merged_df.insert_column(1, merged_df.drop_in_place("Actual_Gene_Name"))
 
-        cols = merged_df.columns
-        if "Actual_Gene_Name" in cols:
-            new_order = ["Gene_Code", "Actual_Gene_Name"] + [col for col in cols if col not in ["Gene_Code", "Actual_Gene_Name"]]
-            merged_df = merged_df.select(new_order)
-            
         return merged_df
\ No newline at end of file
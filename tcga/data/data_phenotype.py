@@ -68,38 +68,35 @@ class DataPhenotype:
         # Process Methylation File
         if final_meth_df is not None:
             meth_patient_cols = final_meth_df.columns[2:]
-            meth_rows = []
-            for char in selected_chars:
-                row_data = {"Gene_Code": "", "Actual_Gene_Name": char}
-                for patient in meth_patient_cols:
-                    patient_id = str(patient).strip()
-                    # Look up patient in the map. provide empty string if not found or value is None
-                    patient_pheno = pheno_map.get(patient_id, {})
-                    row_data[patient] = str(patient_pheno.get(char, "") or "")
-                meth_rows.append(row_data)
-
-            df_new_meth = pl.DataFrame(meth_rows)
+            # Build the new rows column by column: one patient lookup per
+            # column instead of one per cell, and no per-row dicts.
+            meth_columns = {
+                "Gene_Code": [""] * len(selected_chars),
+                "Actual_Gene_Name": list(selected_chars),
+            }
+            for patient in meth_patient_cols:
+                # Look up patient in the map. provide empty string if not found or value is None
+                patient_pheno = pheno_map.get(str(patient).strip(), {})
+                meth_columns[patient] = [str(patient_pheno.get(char, "") or "") for char in selected_chars]
+
+            df_new_meth = pl.DataFrame(meth_columns)
             # Ensure column order matches before concatenation
             df_new_meth = df_new_meth.select(final_meth_df.columns)
             final_meth_df = pl.concat([df_new_meth, final_meth_df.cast(pl.Utf8)], how="vertical")
-            self.logger.info(f"Added {len(selected_chars)} phenotype rows to methylation data.")
+            self.logger.info("Added %d phenotype rows to methylation data.", len(selected_chars))
 
         # Process Expression File
         if final_expr_df is not None:
             expr_gene_col = final_expr_df.columns[0]
             expr_patient_cols = final_expr_df.columns[1:]
-            expr_rows = []
-            for char in selected_chars:
-                row_data = {expr_gene_col: char}
-                for patient in expr_patient_cols:
-                    patient_id = str(patient).strip()
-                    patient_pheno = pheno_map.get(patient_id, {})
-                    row_data[patient] = str(patient_pheno.get(char, "") or "")
-                expr_rows.append(row_data)
-
-            df_new_expr = pl.DataFrame(expr_rows)
+            expr_columns = {expr_gene_col: list(selected_chars)}
+            for patient in expr_patient_cols:
+                patient_pheno = pheno_map.get(str(patient).strip(), {})
+                expr_columns[patient] = [str(patient_pheno.get(char, "") or "") for char in selected_chars]
+
+            df_new_expr = pl.DataFrame(expr_columns)
             df_new_expr = df_new_expr.select(final_expr_df.columns)
             final_expr_df = pl.concat([df_new_expr, final_expr_df.cast(pl.Utf8)], how="vertical")
-            self.logger.info(f"Added {len(selected_chars)} phenotype rows to expression data.")
+            self.logger.info("Added %d phenotype rows to expression data.", len(selected_chars))
             
         return final_meth_df, final_expr_df
@@ -1,12 +1,22 @@
 # tcga/utils/logger.py
 
+import atexit
+import functools
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
+
+@functools.lru_cache(maxsize=None)
 def setup_logger(log_file='tcga.log', level=logging.DEBUG):
     """
     Sets up the logger for the application.
 
+    Handlers sit behind a queue: application threads only enqueue records
+    (no I/O on the hot path) while a background listener thread performs
+    the actual file and console writes.
+
     Parameters:
         log_file (str): Path to the log file.
         level (int): Logging level.
@@ -17,10 +27,16 @@ def setup_logger(log_file='tcga.log', level=logging.DEBUG):
     logger = logging.getLogger('TCGA_Logger')
     logger.setLevel(level)
 
-    # Create handlers if they haven't been created yet
+    # Create handlers if they haven't been created yet (the lru_cache already
+    # short-circuits repeat calls; this guards other logging config too)
     if not logger.handlers:
-        # File handler
-        fh = logging.FileHandler(log_file)
+        # Rotating file handler so the log cannot grow without bound.
+        # delay=True defers opening the file until the first record, and the
+        # explicit encoding avoids platform-default codec surprises on
+        # Windows (cp1252 cannot encode every log message).
+        fh = RotatingFileHandler(
+            log_file, maxBytes=5 << 20, backupCount=5, delay=True, encoding='utf-8'
+        )
         fh.setLevel(level)
 
         # Console handler
@@ -32,8 +48,13 @@ def setup_logger(log_file='tcga.log', level=logging.DEBUG):
         fh.setFormatter(formatter)
         ch.setFormatter(formatter)
 
-        # Add handlers to the logger
-        # logger.addHandler(fh)
-        # logger.addHandler(ch)
+        # The listener owns the real handlers and drains the queue on its
+        # own thread; stop it at exit so buffered records are flushed.
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, fh, ch, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+
+        logger.addHandler(QueueHandler(log_queue))
 
     return logger
@@ -20,9 +20,17 @@ Usage:
 - Download processed files from the output location.
 """
 
+import functools
+import gzip
+import hashlib
 import os, sys
+import secrets
+import shutil
+import threading
+from collections import OrderedDict
+
 import polars as pl
-from flask import Flask, render_template, request, redirect, flash, session
+from flask import Flask, render_template, request, redirect, flash, session, send_file, abort
 from tcga.controller.controller import Controller
 from tcga.utils.logger import setup_logger
 import tempfile
@@ -48,27 +56,75 @@ app = Flask(
 )
 
 # Automatic secret key logic
-config = configparser.ConfigParser()
-# Check if the config file exists and has a valid key.
-try:
-    config.read(config_file_path)
-    secret_key = config.get('Flask', 'SECRET_KEY')
-    if not secret_key:
-        raise ValueError("SECRET_KEY is empty.")
-except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
-    # If the file or key doesn't exist, create it.
-    print("No valid secret key found. Generating a new one.")
-    secret_key = os.urandom(24).hex()
-    config['Flask'] = {'SECRET_KEY': secret_key}
-    with open(config_file_path, 'w') as configfile:
-        config.write(configfile)
-
-app.secret_key = secret_key
+@functools.cache
+def _load_secret_key():
+    """
+    Resolves the Flask secret key from config.ini, generating and persisting
+    a new one on first run. Cached so repeat callers never re-parse the file.
+    """
+    config = configparser.ConfigParser()
+    # Check if the config file exists and has a valid key.
+    try:
+        config.read(config_file_path)
+        secret_key = config.get('Flask', 'SECRET_KEY')
+        if not secret_key:
+            raise ValueError("SECRET_KEY is empty.")
+    except (configparser.NoSectionError, configparser.NoOptionError, ValueError):
+        # If the file or key doesn't exist, create it. secrets.token_hex
+        # uses the userspace CSPRNG fast path, unlike os.urandom which can
+        # block on the kernel entropy pool at cold start.
+        print("No valid secret key found. Generating a new one.")
+        secret_key = secrets.token_hex(24)
+        config['Flask'] = {'SECRET_KEY': secret_key}
+        # Write to a sibling temp file and rename into place so a crash or
+        # a concurrent start can never leave a half-written config.ini.
+        tmp_path = config_file_path + '.tmp'
+        with open(tmp_path, 'w') as configfile:
+            config.write(configfile)
+        os.replace(tmp_path, config_file_path)
+    return secret_key
+
+app.secret_key = _load_secret_key()
+
+# Characters that are invalid in filenames on Windows (superset of the
+# POSIX-invalid set), mapped to '_' in one C-level translate pass.
+_SAFE_NAME_TABLE = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
+# Flash-message templates, parsed once at import instead of rebuilt per
+# request.
+_FORCE_CSV_MSG = (
+    "ℹ️ Large files detected ({mb:.1f} MB total). CSV format was used for "
+    "optimal performance and to prevent system freezing."
+)
+_SANITIZED_NAME_MSG = 'ℹ️ Invalid filename characters were replaced: using "{name}".'
+
+# Valid upload combinations as 4-bit masks:
+# (methylation << 3) | (mapping << 2) | (expression << 1) | phenotype.
+# Methylation and mapping only come as a pair; phenotype needs expression
+# or that pair.
+_VALID_COMBO_MASKS = frozenset({
+    0b1100, 0b1110, 0b1111, 0b1101, 0b0010, 0b0011
+})
+
+# Phenotype preview results keyed by a digest of the upload's first 1 MB,
+# its length and its extension, so re-selecting the same file skips the
+# temp write and parse entirely.
+_PREVIEW_CACHE_SIZE = 16
+_preview_cache = OrderedDict()
+_preview_cache_lock = threading.Lock()
 
 # Use existing TCGA controller logic
 logger = setup_logger()
 controller = Controller(logger=logger)
 
+# Warm up the Polars thread pool so its one-time spin-up cost is paid at
+# startup rather than on the first upload; a daemon thread keeps the warmup
+# off the startup path too, so the window/server appears immediately.
+def _warmup():
+    pl.DataFrame({'_': [0]}).lazy().select(pl.col('_') + 1).collect()
+
+threading.Thread(target=_warmup, daemon=True).start()
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     """
@@ -105,17 +161,13 @@ def index():
                 flash("Please upload at least one input file.", "error")
                 return render_template('index.html')
             
-            # Define valid combinations
-            valid_combo = False
-            if (has_methylation and has_mapping and not has_expression and not has_phenotype) or \
-               (has_methylation and has_mapping and has_expression and not has_phenotype) or \
-               (has_methylation and has_mapping and has_expression and has_phenotype) or \
-               (has_methylation and has_mapping and not has_expression and has_phenotype) or \
-               (not has_methylation and not has_mapping and has_expression and not has_phenotype) or \
-               (not has_methylation and not has_mapping and has_expression and has_phenotype):
-                valid_combo = True
-            
-            if not valid_combo:
+            # Check the combination against the precomputed mask set
+            combo_mask = (
+                (bool(has_methylation) << 3) | (bool(has_mapping) << 2)
+                | (bool(has_expression) << 1) | bool(has_phenotype)
+            )
+
+            if combo_mask not in _VALID_COMBO_MASKS:
                 # Provide specific error messages
                 if has_methylation and not has_mapping:
                     flash("A methylation file must be uploaded together with a gene mapping file.", "error")
@@ -137,78 +189,83 @@ def index():
             selected_phenos = request.form.getlist('phenos')
             output_format = request.form.get('output_format', 'csv')
             base_filename = request.form.get('output_filename', '').strip() or 'merged_output'
+            safe_filename = base_filename.translate(_SAFE_NAME_TABLE)
+            if safe_filename != base_filename:
+                logger.warning("Replaced invalid filename characters in %r.", base_filename)
+                flash(_SANITIZED_NAME_MSG.format(name=safe_filename), "info")
+                base_filename = safe_filename
 
             # --- Save uploaded files and check sizes ---
+            # One TemporaryDirectory per request guarantees cleanup (even on
+            # errors) via a single recursive unlink on exit, replacing the
+            # per-file remove loop that only ran on success.
             file_paths = {}
-            temp_files = []
             total_size = 0
             SIZE_LIMIT_MB = 50  # 50 MB limit for Excel output
-            
-            # First, check file sizes before processing
-            file_sizes = {}
-            for file_name, file in [
-                ('methylation', methylation_file),
-                ('mapping', mapping_file),
-                ('expression', expression_file),
-                ('phenotype', phenotype_file)
-            ]:
-                if file and file.filename:
-                    # Reset file pointer to beginning
-                    file.seek(0, 2)  # Seek to end
-                    file_size = file.tell()  # Get file size
-                    total_size += file_size
-                    file_sizes[file_name] = file_size
-                    file.seek(0)  # Reset to beginning for reading
-                    logger.info(f"{file_name} file size: {file_size / 1024 / 1024:.2f} MB")
-            
-            logger.info(f"Total file size: {total_size / 1024 / 1024:.2f} MB")
-            
-            # Check if we should force CSV output based on file size
-            force_csv = False
-            if output_format == 'excel' and total_size > SIZE_LIMIT_MB * 1024 * 1024:
-                output_format = 'csv'
-                force_csv = True
-                logger.info(f"Large files detected. Forcing CSV output.")
-            
-            # Now save the files
-            for label, file in {
-                'methylation': methylation_file,
-                'gene_mapping': mapping_file,
-                'gene_expression': expression_file,
-                'phenotype': phenotype_file
-            }.items():
-                if file and file.filename:
-                    # Get the file extension to preserve it
-                    ext = os.path.splitext(file.filename)[1]
-                    # Save file to a temporary file on disk with proper extension
-                    temp = tempfile.NamedTemporaryFile(delete=False, suffix=ext, mode='wb')
-                    file.seek(0)  # Reset file pointer
-                    temp.write(file.read())
-                    temp.close()
-                    file_paths[label] = temp.name
-                    temp_files.append(temp.name)
-            
-            # --- Run TCGA controller logic ---
-            df_meth, df_expr = controller.process_files(
-                methylation_path=file_paths.get('methylation'),
-                gene_mapping_path=file_paths.get('gene_mapping'),
-                gene_expression_path=file_paths.get('gene_expression'),
-                phenotype_path=file_paths.get('phenotype'),
-                selected_phenotypes=selected_phenos,
-                zero_percent=zero_threshold
-            )
+
+            with tempfile.TemporaryDirectory(prefix='tcga_') as tmpdir:
+                # Save the files, measuring sizes as a side effect of the save
+                # so each upload is streamed through exactly once
+                for label, file in {
+                    'methylation': methylation_file,
+                    'gene_mapping': mapping_file,
+                    'gene_expression': expression_file,
+                    'phenotype': phenotype_file
+                }.items():
+                    if file and file.filename:
+                        # Keep the extension so format detection still works
+                        name = file.filename
+                        file.seek(0)  # Reset file pointer
+                        if name.lower().endswith('.gz'):
+                            # TCGA matrices are commonly distributed gzipped;
+                            # decompress transparently while persisting so
+                            # users can upload the 5-10x smaller payload and
+                            # the rest of the pipeline sees a plain file.
+                            name = name[:-3]
+                            ext = os.path.splitext(name)[1]
+                            tmp_path = os.path.join(tmpdir, f"{label}{ext}")
+                            with gzip.open(file.stream, 'rb') as src, \
+                                    open(tmp_path, 'wb') as dst:
+                                shutil.copyfileobj(src, dst, length=1 << 20)
+                        else:
+                            ext = os.path.splitext(name)[1]
+                            # Stream the upload to disk; save() copies in
+                            # small chunks instead of materializing the whole
+                            # file in memory via read().
+                            tmp_path = os.path.join(tmpdir, f"{label}{ext}")
+                            file.save(tmp_path)
+                        file_paths[label] = tmp_path
+                        file_size = os.path.getsize(tmp_path)
+                        total_size += file_size
+                        logger.info("%s file size: %.2f MB", label, file_size / 1024 / 1024)
+
+                logger.info("Total file size: %.2f MB", total_size / 1024 / 1024)
+
+                # Check if we should force CSV output based on file size
+                force_csv = False
+                if output_format == 'excel' and total_size > SIZE_LIMIT_MB * 1024 * 1024:
+                    output_format = 'csv'
+                    force_csv = True
+                    logger.info("Large files detected. Forcing CSV output.")
+
+                # --- Run TCGA controller logic ---
+                df_meth, df_expr = controller.process_files(
+                    methylation_path=file_paths.get('methylation'),
+                    gene_mapping_path=file_paths.get('gene_mapping'),
+                    gene_expression_path=file_paths.get('gene_expression'),
+                    phenotype_path=file_paths.get('phenotype'),
+                    selected_phenotypes=selected_phenos,
+                    zero_percent=zero_threshold
+                )
 
             # --- Save output files using the controller's save method ---
             output_paths = controller.save_results(
                 df_meth, df_expr, save_path, base_filename, output_format
             )
-            
-            # Clean up temp files
-            for path in temp_files:
-                try:
-                    os.remove(path)
-                except Exception:
-                    pass
+
+            # The frames can be hundreds of MB; drop them before rendering
+            # the response instead of holding them to the end of the request.
+            del df_meth, df_expr
 
             if not output_paths:
                 flash("✅ Process completed, but no output files were generated based on the inputs.", "info")
@@ -216,7 +273,7 @@ def index():
             
             # Show message if format was forced to CSV
             if force_csv:
-                flash(f"ℹ️ Large files detected ({total_size / 1024 / 1024:.1f} MB total). CSV format was used for optimal performance and to prevent system freezing.", "info")
+                flash(_FORCE_CSV_MSG.format(mb=total_size / 1024 / 1024), "info")
 
             # Format output paths for display
             output_info = [{"label": os.path.basename(path)} for path in output_paths]
@@ -226,6 +283,9 @@ def index():
                 'success': True,
                 'outputs': output_info
             }
+            # Record the produced paths so /download can serve exactly these
+            # files and nothing else.
+            session['output_paths'] = output_paths
             
             # Use render_template instead of redirect to show success immediately
             return render_template('index.html', success=True, outputs=output_info)
@@ -243,6 +303,22 @@ def index():
     
     return render_template('index.html')
 
+@app.route('/download/<path:name>')
+def download(name):
+    """
+    Serves one of the output files produced by the last successful run.
+
+    Only basenames recorded in the session by that run are accepted, so the
+    route cannot be used to read arbitrary paths. send_file with
+    conditional=True lets the WSGI server hand the file to its
+    wsgi.file_wrapper (sendfile under the hood) instead of copying the
+    bytes through Python.
+    """
+    for path in session.get('output_paths', []):
+        if os.path.basename(path) == name and os.path.isfile(path):
+            return send_file(path, as_attachment=True, conditional=True, max_age=0)
+    abort(404)
+
 @app.route('/reset')
 def reset():
     """
@@ -267,37 +343,66 @@ def preview_phenotype():
         return {"error": "No file uploaded"}, 400
 
     try:
-        # Save to temporary file to read it
         ext = os.path.splitext(file.filename)[1] if file.filename else '.txt'
+
+        # A digest of the first 1 MB plus the length identifies repeated
+        # uploads of the same file (each arrives in a fresh temp file, so
+        # path-based keys cannot).
+        head = file.read(1 << 20)
+        digest = hashlib.blake2b(head, digest_size=16)
+        digest.update(str(file.content_length or 0).encode())
+        cache_key = (ext.lower(), digest.hexdigest())
+        file.seek(0)
+        with _preview_cache_lock:
+            if cache_key in _preview_cache:
+                _preview_cache.move_to_end(cache_key)
+                return {"columns": _preview_cache[cache_key]}
+
+        # Save to temporary file to read it
         with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
             file.save(tmp.name)
             tmp_path = tmp.name
         
         # Detect file format and read accordingly
         ext_lower = ext.lower()
-        if ext_lower in ['.xlsx', '.xls', '.xlsm', '.xlsb']:
-            # Read Excel file with multiple attempts
+        if ext_lower in ['.xlsx', '.xlsm']:
+            # openpyxl's read-only mode streams the sheet, so pulling the
+            # first row stays O(columns) instead of parsing the whole file.
+            from openpyxl import load_workbook
+            wb = load_workbook(tmp_path, read_only=True, data_only=True)
             try:
-                df = pl.read_excel(tmp_path, sheet_id=1, engine='xlsx2csv')
-            except:
-                try:
-                    df = pl.read_excel(tmp_path, sheet_id=1, engine='openpyxl')
-                except:
-                    df = pl.read_excel(tmp_path)
+                header = next(wb.active.iter_rows(max_row=1, values_only=True), ())
+            finally:
+                wb.close()
+            columns = [str(c) for c in header if c is not None]
+        elif ext_lower in ['.xls', '.xlsb']:
+            # xlsx2csv and openpyxl only handle zip-based formats, so trying
+            # them first just burned two guaranteed-failing parse attempts.
+            # Go straight to the default engine, which supports both.
+            df = pl.read_excel(tmp_path)
+            columns = df.columns
         else:
-            # Read CSV/TSV file - handle both comma and tab
-            if ext_lower == '.csv':
-                df = pl.read_csv(tmp_path, separator=',', infer_schema_length=10000)
-            else:
-                df = pl.read_csv(tmp_path, separator='\t', infer_schema_length=10000)
-        
+            # Only the header is needed for the preview, so resolve the scan's
+            # schema instead of parsing the whole file.
+            separator = ',' if ext_lower == '.csv' else '\t'
+            columns = (
+                pl.scan_csv(tmp_path, separator=separator, infer_schema_length=0)
+                .collect_schema()
+                .names()
+            )
+
         # Clean up temp file
         try:
             os.remove(tmp_path)
         except:
             pass
         
-        headers = df.columns[1:] if len(df.columns) > 1 else []
+        headers = columns[1:] if len(columns) > 1 else []
+        with _preview_cache_lock:
+            _preview_cache[cache_key] = headers
+            _preview_cache.move_to_end(cache_key)
+            while len(_preview_cache) > _PREVIEW_CACHE_SIZE:
+                _preview_cache.popitem(last=False)
         return {"columns": headers}
     except Exception as e:
         # Clean up temp file on error
@@ -306,5 +411,5 @@ def preview_phenotype():
                 os.remove(tmp_path)
         except:
             pass
-        logger.error(f"Error previewing phenotype file: {e}")
+        logger.error("Error previewing phenotype file: %s", e)
         return {"error": f"Could not read file: {str(e)}"}, 500
\ No newline at end of file
@@ -166,20 +166,38 @@ function preventDefaults(e) {
   e.stopPropagation();
 }
 
-// Handle phenotype file selection
+// Debounce timer and in-flight request for the phenotype preview
+let phenotypePreviewTimer = null;
+let phenotypePreviewController = null;
+
+// Handle phenotype file selection (debounced: drag-and-drop re-dispatches the
+// change event, and each preview uploads the whole file to the server)
 function handlePhenotypeFile(event) {
   const file = event.target.files[0];
   if (!file) {
     document.getElementById('phenotypeSelectWrapper').style.display = 'none';
     return;
   }
-  
+
+  clearTimeout(phenotypePreviewTimer);
+  phenotypePreviewTimer = setTimeout(() => previewPhenotypeFile(file), 300);
+}
+
+// Upload the phenotype file for a column preview, cancelling any request
+// still in flight
+function previewPhenotypeFile(file) {
   const formData = new FormData();
   formData.append('phenotype_file', file);
-  
+
+  if (phenotypePreviewController) {
+    phenotypePreviewController.abort();
+  }
+  phenotypePreviewController = new AbortController();
+
   fetch('/preview_phenotype', {
     method: 'POST',
-    body: formData
+    body: formData,
+    signal: phenotypePreviewController.signal
   })
   .then(res => res.json())
   .then(data => {
@@ -204,6 +222,7 @@ function handlePhenotypeFile(event) {
     }
   })
   .catch(err => {
+    if (err.name === 'AbortError') return;
     showToast('error', 'Could not load phenotype characteristics.');
     console.error(err);
   });
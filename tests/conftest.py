@@ -0,0 +1,17 @@
+import pytest
+
+import tcga.controller.controller as controller_module
+import tcga.data.file_handler as file_handler_module
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """
+    Points the shared on-disk cache at a per-test temp directory so the
+    suite never writes into (or hits stale entries in) the real user's
+    ~/.cache/tcga.
+    """
+    cache_dir = str(tmp_path / "tcga_cache")
+    monkeypatch.setattr(file_handler_module, "CACHE_DIR", cache_dir)
+    monkeypatch.setattr(controller_module, "CACHE_DIR", cache_dir)
+    yield cache_dir
@@ -41,10 +41,15 @@ def controller():
     """Provides a Controller instance for testing."""
     return Controller()
 
+def _mock_loads(mocker, meth=None, mapping=None, expr=None, pheno=None):
+    """Mocks load_dataframe to dispatch on file type (loads may run in parallel)."""
+    frames = {'methylation': meth, 'gene_mapping': mapping,
+              'gene_expression': expr, 'phenotype': pheno}
+    mocker.patch('tcga.data.file_handler.FileHandler.load_dataframe',
+                 side_effect=lambda path, file_type: frames[file_type])
+
 def test_scenario_methylation_and_mapping_only(mocker, controller, sample_methylation_df, sample_gene_mapping_df):
-    mocker.patch('tcga.data.file_handler.FileHandler.load_dataframe', side_effect=[
-        sample_methylation_df, sample_gene_mapping_df, None, None
-    ])
+    _mock_loads(mocker, meth=sample_methylation_df, mapping=sample_gene_mapping_df)
     final_meth, final_expr = controller.process_files(
         methylation_path="fake/meth.txt", gene_mapping_path="fake/map.txt"
     )
@@ -53,9 +58,7 @@ def test_scenario_methylation_and_mapping_only(mocker, controller, sample_methyl
     assert final_meth.shape[0] == 2
 
 def test_scenario_expression_only(mocker, controller, sample_expression_df):
-    mocker.patch('tcga.data.file_handler.FileHandler.load_dataframe', side_effect=[
-        None, None, sample_expression_df, None
-    ])
+    _mock_loads(mocker, expr=sample_expression_df)
     final_meth, final_expr = controller.process_files(gene_expression_path="fake/expr.txt")
     assert final_meth is None
     assert final_expr is not None
@@ -67,9 +70,7 @@ def test_scenario_expression_only(mocker, controller, sample_expression_df):
     assert_frame_equal(final_expr, expected_expr)
 
 def test_scenario_meth_and_expr_no_pheno(mocker, controller, sample_methylation_df, sample_gene_mapping_df, sample_expression_df):
-    mocker.patch('tcga.data.file_handler.FileHandler.load_dataframe', side_effect=[
-        sample_methylation_df, sample_gene_mapping_df, sample_expression_df, None
-    ])
+    _mock_loads(mocker, meth=sample_methylation_df, mapping=sample_gene_mapping_df, expr=sample_expression_df)
     final_meth, final_expr = controller.process_files(
         methylation_path="fake/meth.txt", gene_mapping_path="fake/map.txt", gene_expression_path="fake/expr.txt"
     )
@@ -77,9 +78,8 @@ def test_scenario_meth_and_expr_no_pheno(mocker, controller, sample_methylation_
     assert final_expr.shape[0] == 2
 
 def test_scenario_all_files(mocker, controller, sample_methylation_df, sample_gene_mapping_df, sample_expression_df, sample_phenotype_df):
-    mocker.patch('tcga.data.file_handler.FileHandler.load_dataframe', side_effect=[
-        sample_methylation_df, sample_gene_mapping_df, sample_expression_df, sample_phenotype_df
-    ])
+    _mock_loads(mocker, meth=sample_methylation_df, mapping=sample_gene_mapping_df,
+                expr=sample_expression_df, pheno=sample_phenotype_df)
     final_meth, final_expr = controller.process_files(
         methylation_path="fake/meth.txt", gene_mapping_path="fake/map.txt",
         gene_expression_path="fake/expr.txt", phenotype_path="fake/pheno.txt",
@@ -89,17 +89,13 @@ def test_scenario_all_files(mocker, controller, sample_methylation_df, sample_ge
     assert final_expr.shape[0] == 3
 
 def test_error_missing_mapping_file(mocker, controller, sample_methylation_df):
-    mocker.patch('tcga.data.file_handler.FileHandler.load_dataframe', side_effect=[
-        sample_methylation_df, None, None, None
-    ])
+    _mock_loads(mocker, meth=sample_methylation_df)
     with pytest.raises(ValueError, match="Methylation file was provided without a gene mapping file."):
         controller.process_files(methylation_path="fake/meth.txt")
 
 def test_error_no_common_genes(mocker, controller, sample_methylation_df, sample_expression_df):
     no_common_gene_map = pl.DataFrame({"Gene_Code": ["cg01"], "Actual_Gene_Name": ["GENE_Z"]})
-    mocker.patch('tcga.data.file_handler.FileHandler.load_dataframe', side_effect=[
-        sample_methylation_df, no_common_gene_map, sample_expression_df, None
-    ])
+    _mock_loads(mocker, meth=sample_methylation_df, mapping=no_common_gene_map, expr=sample_expression_df)
     with pytest.raises(ValueError, match="No common genes found"):
         controller.process_files(
             methylation_path="fake/meth.txt", gene_mapping_path="fake/map.txt", gene_expression_path="fake/expr.txt"
@@ -27,10 +27,11 @@ def test_clean_merged_df_removes_invalid_genes(data_cleaner):
         "Patient1": [1.0, 2.0, 3.0],
     })
     
+    # Data columns come out as Float32 (the pipeline's methylation dtype).
     expected_df = pl.DataFrame({
         "Gene_Code": ["A", "C"],
         "Actual_Gene_Name": ["GeneA", "GeneC"],
-        "Patient1": [1.0, 3.0],
+        "Patient1": pl.Series([1.0, 3.0], dtype=pl.Float32),
     })
 
     cleaned_df = data_cleaner.clean_merged_df(input_df)
@@ -49,7 +50,7 @@ def test_clean_merged_df_handles_na_and_dots(data_cleaner):
     expected_df = pl.DataFrame({
         "Gene_Code": ["A", "B", "C", "D"],
         "Actual_Gene_Name": ["GeneA", "GeneB", "GeneC", "GeneD"],
-        "Patient1": [1.5, 0.0, 0.0, 0.0],
+        "Patient1": pl.Series([1.5, 0.0, 0.0, 0.0], dtype=pl.Float32),
     })
     
     cleaned_df = data_cleaner.clean_merged_df(input_df)
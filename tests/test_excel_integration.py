@@ -41,8 +41,8 @@ class TestExcelFileHandling:
         excel_path = tmp_path / "test.xlsx"
         test_df.write_excel(str(excel_path))
         
-        # Test reading
-        loaded_df = file_handler._read_file(str(excel_path))
+        # Test reading (_read_file returns a lazy query)
+        loaded_df = file_handler._read_file(str(excel_path)).collect()
         assert loaded_df is not None
         assert loaded_df.shape == test_df.shape
         assert loaded_df.columns == test_df.columns
@@ -87,6 +87,60 @@ class TestExcelFileHandling:
         loaded_df = pl.read_csv(expected_path)
         assert loaded_df.shape == test_df.shape
 
+    def test_save_parquet_file(self, file_handler, tmp_path):
+        """Test saving DataFrames as Parquet files."""
+        test_df = pl.DataFrame({
+            "Gene_Name": ["GENE1", "GENE2", "GENE3"],
+            "Sample1": [1.0, 2.0, 3.0],
+            "Sample2": [4.0, 5.0, 6.0]
+        })
+
+        # Test saving as Parquet
+        output_path = str(tmp_path / "output_test")
+        file_handler.save_dataframe(test_df, output_path, 'parquet')
+
+        # Check file was created with correct extension
+        expected_path = output_path + ".parquet"
+        assert os.path.exists(expected_path)
+
+        # Read back and verify the round trip is lossless
+        loaded_df = pl.read_parquet(expected_path)
+        assert loaded_df.equals(test_df)
+
+    def test_save_feather_file(self, file_handler, tmp_path):
+        """Test saving DataFrames as Feather (Arrow IPC) files."""
+        test_df = pl.DataFrame({
+            "Gene_Name": ["GENE1", "GENE2", "GENE3"],
+            "Sample1": [1.0, 2.0, 3.0],
+            "Sample2": [4.0, 5.0, 6.0]
+        })
+
+        # Test saving as Feather
+        output_path = str(tmp_path / "output_test")
+        file_handler.save_dataframe(test_df, output_path, 'feather')
+
+        # Check file was created with correct extension
+        expected_path = output_path + ".feather"
+        assert os.path.exists(expected_path)
+
+        # Read back and verify the round trip is lossless
+        loaded_df = pl.read_ipc(expected_path)
+        assert loaded_df.equals(test_df)
+
+    def test_save_normalizes_wrong_extension(self, file_handler, tmp_path):
+        """Test that a mismatched extension is replaced, not appended to."""
+        test_df = pl.DataFrame({"Gene_Name": ["GENE1"], "Sample1": [1.0]})
+
+        # A .csv path saved as parquet should end up as .parquet
+        file_handler.save_dataframe(test_df, str(tmp_path / "out.csv"), 'parquet')
+        assert os.path.exists(tmp_path / "out.parquet")
+        assert not os.path.exists(tmp_path / "out.csv")
+
+        # And vice versa for feather
+        file_handler.save_dataframe(test_df, str(tmp_path / "out2.parquet"), 'feather')
+        assert os.path.exists(tmp_path / "out2.feather")
+        assert not os.path.exists(tmp_path / "out2.parquet")
+
 
 class TestMixedFormatProcessing:
     """Test processing with mixed CSV and Excel input files."""
@@ -221,6 +275,23 @@ class TestControllerSaveResults:
         assert paths1[0] != paths2[0]
         assert "test_methylation_1.csv" in paths2[0]
 
+    def test_save_results_counter_skips_existing_files(self, controller, tmp_path):
+        """Test that the reservation loop walks past occupied counter slots."""
+        # Occupy the base name and the first counter slot
+        (tmp_path / "test_methylation.csv").write_text("existing")
+        (tmp_path / "test_methylation_1.csv").write_text("existing")
+
+        df = pl.DataFrame({"col": [1, 2, 3]})
+        paths = controller.save_results(df, None, str(tmp_path), "test", "csv")
+
+        assert len(paths) == 1
+        assert paths[0].endswith("test_methylation_2.csv")
+        assert os.path.exists(paths[0])
+
+        # Pre-existing files must not be overwritten
+        assert (tmp_path / "test_methylation.csv").read_text() == "existing"
+        assert (tmp_path / "test_methylation_1.csv").read_text() == "existing"
+
 
 class TestExcelWithPhenotype:
     """Test Excel files with phenotype data."""
@@ -18,10 +18,11 @@ def test_load_dataframe_success_methylation(file_handler, tmp_path):
     p = tmp_path / "methylation.txt"
     p.write_text(file_content)
     
+    # Beta values are downcast to Float32 on ingest.
     expected_df = pl.DataFrame({
         "Gene_Code": ["cg00000029", "cg00000108"],
-        "Patient1": [0.2, 0.5],
-        "Patient2": [0.8, 0.5]
+        "Patient1": pl.Series([0.2, 0.5], dtype=pl.Float32),
+        "Patient2": pl.Series([0.8, 0.5], dtype=pl.Float32)
     })
 
     df = file_handler.load_dataframe(str(p), 'methylation')
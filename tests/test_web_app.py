@@ -0,0 +1,83 @@
+import gzip
+import io
+import os
+
+import polars as pl
+import pytest
+
+# Importing the app module generates config.ini (secret-key persistence) in
+# the repo root; note whether it existed first so the module fixture below
+# can clean up without deleting a real user config.
+_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.ini'
+)
+_CONFIG_PREEXISTING = os.path.exists(_CONFIG_PATH)
+
+from tcga_web_app.app import app
+
+
+@pytest.fixture(scope='module', autouse=True)
+def _cleanup_generated_config():
+    """Removes the config.ini generated by importing the app module."""
+    yield
+    if not _CONFIG_PREEXISTING and os.path.exists(_CONFIG_PATH):
+        os.remove(_CONFIG_PATH)
+
+
+@pytest.fixture
+def client():
+    """Provides a Flask test client."""
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+class TestDownloadRoute:
+    """Test that /download only serves session-recorded output files."""
+
+    def test_download_without_session_returns_404(self, client, tmp_path):
+        """A request with no recorded outputs must be rejected."""
+        secret = tmp_path / "secret.csv"
+        secret.write_text("should,not,leak\n")
+        assert client.get('/download/secret.csv').status_code == 404
+
+    def test_download_unrecorded_name_returns_404(self, client, tmp_path):
+        """Only basenames recorded by the last run may be served."""
+        recorded = tmp_path / "recorded.csv"
+        recorded.write_text("a,b\n1,2\n")
+        secret = tmp_path / "secret.csv"
+        secret.write_text("should,not,leak\n")
+        with client.session_transaction() as sess:
+            sess['output_paths'] = [str(recorded)]
+        assert client.get('/download/secret.csv').status_code == 404
+
+    def test_download_serves_recorded_output(self, client, tmp_path):
+        """A recorded output downloads with the exact file bytes."""
+        out = tmp_path / "merged_output_expression.csv"
+        out.write_text("Gene_Name,P1\nTP53,1.0\n")
+        with client.session_transaction() as sess:
+            sess['output_paths'] = [str(out)]
+        resp = client.get('/download/merged_output_expression.csv')
+        assert resp.status_code == 200
+        assert resp.data == out.read_bytes()
+
+
+class TestGzipUpload:
+    """Test transparent decompression of gzipped uploads."""
+
+    def test_gzipped_upload_produces_same_output(self, client, tmp_path):
+        """A .tsv.gz upload yields the same CSV output as the plain file."""
+        csv_bytes = b"Gene_Name\tP1\tP2\nTP53\t1.0\t2.0\nBRCA1\t0.0\t3.0\n"
+        resp = client.post('/', data={
+            'expression_file': (io.BytesIO(gzip.compress(csv_bytes)), 'expr.tsv.gz'),
+            'save_folder': str(tmp_path),
+            'output_format': 'csv',
+            'output_filename': 'gz_test',
+        }, content_type='multipart/form-data')
+        assert resp.status_code == 200
+
+        out_path = tmp_path / "gz_test_expression.csv"
+        assert out_path.exists()
+        df = pl.read_csv(out_path)
+        assert df.shape == (2, 3)
+        assert df.get_column("Gene_Name").to_list() == ["TP53", "BRCA1"]